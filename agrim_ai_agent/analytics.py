@@ -0,0 +1,301 @@
+"""
+analytics.py
+
+This module exports incremental snapshots of the sales database to compressed columnar (Parquet)
+files and provides a helper to query them, so that reporting never scans the live SQLite tables
+used by the Flask app.
+
+Each table is written under `<output_dir>/<table>/date=YYYY-MM-DD/`. Event tables (drafts, sends
+and lead changes) are partitioned by the date of the event. Watermarks of the last exported rows
+are kept in `<output_dir>/_watermarks.json`, so every run only reads events and leads that are new
+or changed since the previous one. Leads are mutable, so each export appends the changed leads,
+partitioned by export date, with the lead change version (`_version`) they were read at; the
+latest version of a lead is the row with the highest `_version`.
+
+Past projects are edited in place and have no change log, so each run writes the whole (small)
+table as a snapshot into the partition of the export date, replacing an earlier snapshot of the
+same day. They are not partitioned by `created_at`, since every run would then write the same
+rows again; the latest `date` partition holds the current table.
+
+The output directory defaults to the ANALYTICS_DIR environment variable (which may be set in
+`.env`), or `analytics/` if it is not set.
+
+Requires the optional `pyarrow` package.
+
+Functions:
+    export_snapshot(output_dir: str = None, snapshot_date: datetime.date = None) -> dict
+        Exports rows added or changed since the last run and returns the row count per table.
+    scan(table: str, columns: list = None, start_date: str = None, end_date: str = None,
+         output_dir: str = None) -> pyarrow.Table
+        Reads the exported files of a table, loading only the requested columns and dates.
+
+Usage Examples:
+    >>> from agrim_ai_agent import analytics
+    >>> analytics.export_snapshot()
+    >>> sends = analytics.scan("email_sends", columns=["sent_at"], start_date="2025-03-01")
+    >>> sends.group_by("date").aggregate([("sent_at", "count")])
+"""
+
+import datetime
+import json
+import logging
+import os
+from sqlalchemy import text
+from agrim_ai_agent import database
+from agrim_ai_agent.env import load_env
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+COMPRESSION = "zstd"
+
+_WATERMARKS_FILE = "_watermarks.json"
+
+# Append-only tables: (table, key column, event timestamp column used for partitioning).
+_APPEND_ONLY_TABLES = [
+    ("drafts", "id", "created_at"),
+    ("email_sends", "id", "sent_at"),
+    ("lead_changes", "version", "changed_at"),
+]
+
+
+def _require_pyarrow():
+    """Imports pyarrow, raising a helpful error if the optional dependency is missing."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Analytics snapshots require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _output_dir(output_dir: str = None) -> str:
+    """Returns the given output directory, or the one configured in the environment."""
+    if output_dir:
+        return output_dir
+    load_env()
+    return os.environ.get("ANALYTICS_DIR", "analytics")
+
+
+def _load_watermarks(output_dir: str) -> dict:
+    """Returns the watermarks of the previous export, or an empty dict on the first run."""
+    path = os.path.join(output_dir, _WATERMARKS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_watermarks(output_dir: str, watermarks: dict) -> None:
+    """Atomically replaces the stored watermarks."""
+    path = os.path.join(output_dir, _WATERMARKS_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _arrow_type(pa, declared_type: str):
+    """
+    Maps a declared SQLite column type to an Arrow type, following SQLite's type affinity rules.
+    DATE/TIME columns are kept as strings, since SQLite stores CURRENT_TIMESTAMP as text.
+    """
+    declared_type = (declared_type or "").upper()
+    if "INT" in declared_type:
+        return pa.int64()
+    if any(name in declared_type for name in ("CHAR", "CLOB", "TEXT", "DATE", "TIME")) or not declared_type:
+        return pa.string()
+    if "BLOB" in declared_type:
+        return pa.binary()
+    # REAL, FLOAT, DOUBLE and NUMERIC/DECIMAL affinity
+    return pa.float64()
+
+
+def _arrow_schema(pa, conn, table: str, extra_columns: list = ()):
+    """Maps the declared SQLite column types of a table to an Arrow schema."""
+    fields = [
+        (column.name, _arrow_type(pa, column.type))
+        for column in conn.execute(text(f"PRAGMA table_info({table})"))
+    ]
+    return pa.schema(fields + [(name, pa.int64()) for name in extra_columns])
+
+
+def _to_float(value):
+    """Converts a value to a float, or returns None if it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    """Converts a value to an int, or returns None if it is not a number or has a fraction."""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _coerce_rows(pa, rows: list, schema) -> list:
+    """
+    Converts row values to their column's Arrow type. SQLite columns can hold values of any
+    type (e.g. an int in a TEXT column), which pyarrow would otherwise reject. Values that
+    cannot be converted without loss (e.g. "n/a" or 1.5 in an INTEGER column) are exported
+    as nulls instead of failing the export.
+    """
+    converters = {}
+    for field in schema:
+        if pa.types.is_string(field.type):
+            converters[field.name] = str
+        elif pa.types.is_floating(field.type):
+            converters[field.name] = _to_float
+        elif pa.types.is_integer(field.type):
+            converters[field.name] = _to_int
+    return [
+        {
+            name: (converters[name](value) if value is not None and name in converters else value)
+            for name, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+def _write_partitions(pa, output_dir: str, table: str, rows: list, schema, part: str,
+                      date_column: str, snapshot_date: datetime.date) -> None:
+    """Groups rows by partition date and writes one Parquet file per date."""
+    partitions = {}
+    for row in rows:
+        value = row.get(date_column) if date_column else None
+        date = str(value)[:10] if value else snapshot_date.isoformat()
+        partitions.setdefault(date, []).append(row)
+    for date, partition_rows in partitions.items():
+        directory = os.path.join(output_dir, table, f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        pa.parquet.write_table(
+            pa.Table.from_pylist(_coerce_rows(pa, partition_rows, schema), schema=schema),
+            os.path.join(directory, f"part-{part}.parquet"),
+            compression=COMPRESSION
+        )
+
+
+def export_snapshot(output_dir: str = None, snapshot_date: datetime.date = None) -> dict:
+    """
+    Exports leads, past projects, drafts, sends and lead changes added since the last export.
+
+    Watermarks are only advanced after every file has been written, so a failed run is
+    simply repeated by the next one.
+
+    Args:
+        output_dir (str, optional): The directory the columnar files are written to.
+            Defaults to $ANALYTICS_DIR or "analytics".
+        snapshot_date (datetime.date, optional): The date partition used for leads and the past
+            projects snapshot. Defaults to today.
+
+    Returns:
+        dict: The number of rows exported per table.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    pa = _require_pyarrow()
+    output_dir = _output_dir(output_dir)
+    snapshot_date = snapshot_date or datetime.date.today()
+    watermarks = _load_watermarks(output_dir)
+    exported = {}
+
+    database.ensure_schema()
+    with database.get_engine().connect() as conn:
+        # Leads change in place, so export those touched since the last exported change version.
+        version = conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM lead_changes")).scalar()
+        last_version = watermarks.get("leads")
+        if last_version is None:
+            query = text("SELECT * FROM leads")
+        else:
+            query = text("""
+                SELECT * FROM leads WHERE id IN (
+                    SELECT lead_id FROM lead_changes WHERE version > :since AND version <= :version
+                )
+            """)
+        rows = [dict(row._mapping, _version=version)
+                for row in conn.execute(query, {"since": last_version, "version": version})]
+        if rows:
+            schema = _arrow_schema(pa, conn, "leads", ["_version"])
+            _write_partitions(pa, output_dir, "leads", rows, schema, str(version), None, snapshot_date)
+        exported["leads"] = len(rows)
+        new_watermarks = {"leads": version}
+
+        # Past projects are updated in place without a change log, so snapshot the whole table.
+        rows = [dict(row._mapping) for row in conn.execute(text("SELECT * FROM past_projects ORDER BY id"))]
+        if rows:
+            schema = _arrow_schema(pa, conn, "past_projects")
+            _write_partitions(pa, output_dir, "past_projects", rows, schema, "snapshot", None, snapshot_date)
+        exported["past_projects"] = len(rows)
+
+        for table, key, date_column in _APPEND_ONLY_TABLES:
+            since = watermarks.get(table, 0)
+            rows = [dict(row._mapping) for row in conn.execute(
+                text(f"SELECT * FROM {table} WHERE {key} > :since ORDER BY {key}"), {"since": since}
+            )]
+            if rows:
+                since = rows[-1][key]
+                schema = _arrow_schema(pa, conn, table)
+                _write_partitions(pa, output_dir, table, rows, schema, str(since), date_column, snapshot_date)
+            exported[table] = len(rows)
+            new_watermarks[table] = since
+
+    _save_watermarks(output_dir, new_watermarks)
+    logger.info("Exported analytics snapshot to %s: %s", output_dir, exported)
+    return exported
+
+
+def scan(table: str, columns: list = None, start_date: str = None, end_date: str = None,
+         output_dir: str = None):
+    """
+    Scans the exported files of a table, reading only the requested columns and date partitions.
+
+    Args:
+        table (str): The exported table, e.g. "leads", "drafts" or "email_sends".
+        columns (list[str], optional): The columns to read. Defaults to all columns.
+        start_date (str, optional): The first partition date to include, as YYYY-MM-DD.
+        end_date (str, optional): The last partition date to include, as YYYY-MM-DD.
+        output_dir (str, optional): The directory the columnar files were written to.
+            Defaults to $ANALYTICS_DIR or "analytics".
+
+    Returns:
+        pyarrow.Table: The matching rows, including the `date` partition column.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        FileNotFoundError: If the table has not been exported yet.
+
+    Example:
+        >>> leads = scan("leads", columns=["id", "status", "requirements", "_version"])
+    """
+    pa = _require_pyarrow()
+    output_dir = _output_dir(output_dir)
+    path = os.path.join(output_dir, table)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No analytics snapshot of {table} in {output_dir}")
+
+    dataset = pa.dataset.dataset(
+        path,
+        format="parquet",
+        partitioning=pa.dataset.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    )
+    date = pa.dataset.field("date")
+    condition = None
+    if start_date:
+        condition = date >= start_date
+    if end_date:
+        condition = date <= end_date if condition is None else condition & (date <= end_date)
+    if columns is not None and "date" not in columns:
+        columns = list(columns) + ["date"]
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+# Run an incremental export, e.g. from a scheduled job.
+if __name__ == '__main__':
+    print(export_snapshot())
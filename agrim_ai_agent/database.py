@@ -4,18 +4,29 @@ database.py
 This module provides functionality for interacting with the leads and past AI projects database.
 
 Functions:
+    get_engine() -> Engine: Returns the SQLAlchemy engine, creating it on first use.
     get_new_leads() -> list[dict]: Retrieves new leads from the database.
     get_past_projects() -> list[dict]: Retrieves past AI projects delivered by the SaaS company.
+    ensure_schema() -> None: Creates the supporting tables and indexes existing leads, once per process.
+    insert_lead(lead: dict) -> int: Inserts or updates a lead, merging or linking it with existing duplicates.
+    get_cached_draft(email: str) -> tuple | None: Retrieves the latest draft stored for an email address.
+    save_draft(lead_id: int, email: str, subject: str, body: str) -> None: Stores a draft for a lead.
+    get_leads_version() -> int: Retrieves the current value of the lead change counter.
+    get_lead_changes(since: int) -> dict: Retrieves the new leads changed after a given version.
+    record_send(lead_id: int, email: str, subject: str) -> None: Records an email sent to a lead.
 
 Usage Examples:
     >>> from agrim_ai_agent import database
     >>> new_leads = database.get_new_leads()
     >>> past_projects = database.get_past_projects()
+    >>> lead_id = database.insert_lead({"name": "John Doe", "email": "john@example.com"})
 """
 
+import json
 import logging
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
+from agrim_ai_agent import dedup
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,7 +35,59 @@ logging.basicConfig(level=logging.INFO)
 # Example connection string; update with appropriate credentials as needed.
 DATABASE_URL = "sqlite:///agrim_ai_agent.db"  # For production, replace with a robust database
 
-engine = create_engine(DATABASE_URL, echo=False)
+_engine = None
+
+def get_engine():
+    """
+    Returns the SQLAlchemy engine, creating it on first use so importing this module stays cheap.
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine connected to DATABASE_URL.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, echo=False)
+    return _engine
+
+_schema_ready = False
+
+def ensure_schema() -> None:
+    """
+    Creates the dedup index, draft, change log and send log tables if needed, and indexes any
+    leads written without going through insert_lead. Runs once per process; later calls are free.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with get_engine().begin() as conn:
+        ensure_dedup_schema(conn)
+        ensure_change_log_schema(conn)
+        ensure_send_log_schema(conn)
+        _backfill_index(conn)
+    _schema_ready = True
+
+# Leads with the id of the lead they possibly duplicate, if the dedup index linked them.
+_LEADS_QUERY = """
+    SELECT leads.*,
+        CASE WHEN lead_index.canonical_id != leads.id THEN lead_index.canonical_id END AS duplicate_of
+    FROM leads LEFT JOIN lead_index ON lead_index.lead_id = leads.id
+"""
+
+def _parse_lead(row) -> dict:
+    """Converts a leads table row to a dictionary with parsed requirements."""
+    lead_dict = dict(row._mapping)
+    # Parse requirements string to dictionary if it exists
+    if lead_dict.get('requirements'):
+        try:
+            lead_dict['requirements'] = json.loads(lead_dict['requirements'])
+        except json.JSONDecodeError:
+            # If not valid JSON, create a simple requirements dict
+            lead_dict['requirements'] = {
+                'description': lead_dict['requirements']
+            }
+    else:
+        lead_dict['requirements'] = {}
+    return lead_dict
 
 def get_new_leads() -> list:
     """
@@ -32,28 +95,15 @@ def get_new_leads() -> list:
 
     Returns:
         list[dict]: A list of dictionaries, each representing a new lead.
-        Each lead includes name, email, and parsed requirements.
+        Each lead includes name, email, and parsed requirements, and `duplicate_of`,
+        the id of the lead it possibly duplicates (or None).
     """
-    query = text("SELECT * FROM leads WHERE status = 'new'")
+    query = text(_LEADS_QUERY + " WHERE leads.status = 'new'")
     try:
-        with engine.connect() as conn:
+        ensure_schema()
+        with get_engine().connect() as conn:
             result = conn.execute(query)
-            leads = []
-            for row in result:
-                lead_dict = dict(row._mapping)
-                # Parse requirements string to dictionary if it exists
-                if lead_dict.get('requirements'):
-                    try:
-                        import json
-                        lead_dict['requirements'] = json.loads(lead_dict['requirements'])
-                    except json.JSONDecodeError:
-                        # If not valid JSON, create a simple requirements dict
-                        lead_dict['requirements'] = {
-                            'description': lead_dict['requirements']
-                        }
-                else:
-                    lead_dict['requirements'] = {}
-                leads.append(lead_dict)
+            leads = [_parse_lead(row) for row in result]
             logger.info("Retrieved %d new lead(s).", len(leads))
             return leads
     except SQLAlchemyError as e:
@@ -69,7 +119,7 @@ def get_past_projects() -> list:
     """
     query = text("SELECT * FROM past_projects")
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             result = conn.execute(query)
             projects = [dict(row._mapping) for row in result]
             logger.info("Retrieved %d past project(s).", len(projects))
@@ -77,3 +127,448 @@ def get_past_projects() -> list:
     except SQLAlchemyError as e:
         logger.error("Error fetching past projects: %s", e)
         return []
+
+def ensure_dedup_schema(conn) -> None:
+    """
+    Creates the lead dedup index and draft tables if they do not exist yet.
+
+    Args:
+        conn: An open SQLAlchemy connection.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS lead_index (
+            lead_id INTEGER PRIMARY KEY,
+            email_key TEXT,
+            name_key TEXT,
+            signature TEXT NOT NULL,
+            canonical_id INTEGER NOT NULL
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lead_index_email_key ON lead_index (email_key)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lead_index_canonical_id ON lead_index (canonical_id)"))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS lead_index_bands (
+            band INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            lead_id INTEGER NOT NULL
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lead_index_bands ON lead_index_bands (band, bucket)"))
+    # Drop deleted leads from the index and hand their duplicates over to the oldest remaining one.
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS leads_after_delete_index AFTER DELETE ON leads
+        BEGIN
+            DELETE FROM lead_index WHERE lead_id = OLD.id;
+            DELETE FROM lead_index_bands WHERE lead_id = OLD.id;
+            INSERT INTO lead_changes (lead_id, change)
+                SELECT lead_id, 'reindex' FROM lead_index WHERE canonical_id = OLD.id ORDER BY lead_id;
+            UPDATE lead_index SET canonical_id = (
+                SELECT MIN(lead_id) FROM lead_index WHERE canonical_id = OLD.id
+            ) WHERE canonical_id = OLD.id;
+        END
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS drafts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER,
+            email_key TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_drafts_email_key ON drafts (email_key)"))
+
+def _find_duplicate(conn, email_key: str, name_key: str, signature: list):
+    """
+    Returns the canonical id of an indexed lead that the given lead duplicates, if any.
+
+    A lead with the same normalized email is always a duplicate. Otherwise, a candidate must
+    have the same normalized name and a signature similarity of at least SIMILARITY_THRESHOLD.
+    Index entries of leads that no longer exist are ignored.
+    """
+    if email_key:
+        row = conn.execute(text("""
+            SELECT COALESCE(canonical.id, li.lead_id) AS canonical_id
+            FROM lead_index li
+            JOIN leads ON leads.id = li.lead_id
+            LEFT JOIN leads canonical ON canonical.id = li.canonical_id
+            WHERE li.email_key = :email_key ORDER BY li.lead_id LIMIT 1
+        """), {"email_key": email_key}).first()
+        if row:
+            return row.canonical_id
+
+    keys = dedup.band_keys(signature)
+    if not keys or not name_key:
+        return None
+    params = {"name_key": name_key}
+    clauses = []
+    for band, bucket in keys:
+        clauses.append(f"(b.band = :band{band} AND b.bucket = :bucket{band})")
+        params[f"band{band}"] = band
+        params[f"bucket{band}"] = bucket
+    candidates = conn.execute(text(f"""
+        SELECT DISTINCT li.lead_id, COALESCE(canonical.id, li.lead_id) AS canonical_id, li.signature
+        FROM lead_index_bands b
+        JOIN lead_index li ON li.lead_id = b.lead_id
+        JOIN leads ON leads.id = li.lead_id
+        LEFT JOIN leads canonical ON canonical.id = li.canonical_id
+        WHERE li.name_key = :name_key AND ({" OR ".join(clauses)})
+    """), params)
+
+    best_id, best_score = None, dedup.SIMILARITY_THRESHOLD
+    for candidate in candidates:
+        score = dedup.estimate_similarity(signature, dedup.decode_signature(candidate.signature))
+        if score >= best_score:
+            best_id, best_score = candidate.canonical_id, score
+    return best_id
+
+def _index_row(conn, lead: dict) -> int:
+    """Indexes a row of the leads table and returns the canonical id it was assigned."""
+    email_key = dedup.normalize_email(lead.get("email"))
+    name_key = dedup.normalize_name(lead.get("name"))
+    signature = dedup.lead_signature(lead)
+    canonical_id = _find_duplicate(conn, email_key, name_key, signature)
+    if canonical_id is None:
+        canonical_id = lead["id"]
+    conn.execute(text("""
+        INSERT OR REPLACE INTO lead_index (lead_id, email_key, name_key, signature, canonical_id)
+        VALUES (:lead_id, :email_key, :name_key, :signature, :canonical_id)
+    """), {
+        "lead_id": lead["id"],
+        "email_key": email_key or None,
+        "name_key": name_key or None,
+        "signature": dedup.encode_signature(signature),
+        "canonical_id": canonical_id
+    })
+    conn.execute(text("DELETE FROM lead_index_bands WHERE lead_id = :lead_id"), {"lead_id": lead["id"]})
+    keys = dedup.band_keys(signature)
+    if keys:
+        conn.execute(
+            text("INSERT INTO lead_index_bands (band, bucket, lead_id) VALUES (:band, :bucket, :lead_id)"),
+            [{"band": band, "bucket": bucket, "lead_id": lead["id"]} for band, bucket in keys]
+        )
+    return canonical_id
+
+def _log_reindex(conn, lead_ids: list) -> None:
+    """Records re-indexed leads in the change log, since their duplicate_of may have changed."""
+    if lead_ids:
+        conn.execute(
+            text("INSERT INTO lead_changes (lead_id, change) VALUES (:id, 'reindex')"),
+            [{"id": lead_id} for lead_id in lead_ids]
+        )
+
+def _backfill_index(conn) -> None:
+    """Indexes leads that were written to the leads table without going through insert_lead."""
+    rows = conn.execute(text("""
+        SELECT * FROM leads WHERE id NOT IN (SELECT lead_id FROM lead_index) ORDER BY id
+    """)).fetchall()
+    for row in rows:
+        _index_row(conn, dict(row._mapping))
+    _log_reindex(conn, [row.id for row in rows])
+    if rows:
+        logger.info("Added %d lead(s) to the dedup index.", len(rows))
+
+def _reindex_lead(conn, lead_id: int, old_email_key: str) -> None:
+    """
+    Re-indexes a lead whose content changed.
+
+    Drafts generated for the lead's previous content are dropped, and leads that were linked
+    to it are re-indexed too, since they may no longer be duplicates of it. Every re-indexed lead
+    gets a change log entry, so deltas pick up its new duplicate_of.
+    """
+    conn.execute(
+        text("DELETE FROM drafts WHERE lead_id = :lead_id OR email_key = :email_key"),
+        {"lead_id": lead_id, "email_key": old_email_key}
+    )
+    affected = [lead_id] + [
+        row.lead_id for row in conn.execute(
+            text("SELECT lead_id FROM lead_index WHERE canonical_id = :lead_id AND lead_id != :lead_id ORDER BY lead_id"),
+            {"lead_id": lead_id}
+        )
+    ]
+    for affected_id in affected:
+        conn.execute(text("DELETE FROM lead_index WHERE lead_id = :lead_id"), {"lead_id": affected_id})
+        conn.execute(text("DELETE FROM lead_index_bands WHERE lead_id = :lead_id"), {"lead_id": affected_id})
+    for affected_id in affected:
+        row = conn.execute(text("SELECT * FROM leads WHERE id = :id"), {"id": affected_id}).first()
+        if row is not None:
+            _index_row(conn, dict(row._mapping))
+    _log_reindex(conn, affected)
+
+def insert_lead(lead: dict) -> int:
+    """
+    Inserts or updates a lead in the leads table, checking the dedup index first.
+
+    A lead with an `id` that already exists is updated in place and re-indexed; drafts of its
+    previous content are dropped. Otherwise, a lead whose normalized email matches an indexed
+    lead is merged into it: missing fields on the existing lead are filled in and no new row is
+    created. A lead with the same name and similar company and requirements is inserted and
+    linked to the existing lead as a possible duplicate, but does not share its drafts.
+
+    Args:
+        lead (dict): The lead data with name, and optionally id, company, email, requirements and status.
+
+    Returns:
+        int: The id of the inserted or updated lead, or of the existing lead it was merged into.
+
+    Raises:
+        SQLAlchemyError: If the lead could not be stored.
+    """
+    requirements = lead.get("requirements")
+    if isinstance(requirements, dict):
+        requirements = json.dumps(requirements)
+    email_key = dedup.normalize_email(lead.get("email"))
+
+    ensure_schema()
+    with get_engine().begin() as conn:
+        _backfill_index(conn)
+        if lead.get("id") is not None:
+            existing = conn.execute(text("SELECT * FROM leads WHERE id = :id"), {"id": lead["id"]}).first()
+            unchanged = existing is not None and (
+                (existing.name, existing.company, existing.email, existing.requirements)
+                == (lead.get("name"), lead.get("company"), lead.get("email"), requirements)
+            )
+            if unchanged:
+                if lead.get("status") and lead["status"] != existing.status:
+                    conn.execute(
+                        text("UPDATE leads SET status = :status WHERE id = :id"),
+                        {"id": lead["id"], "status": lead["status"]}
+                    )
+                return lead["id"]
+            if existing:
+                conn.execute(text("""
+                    UPDATE leads SET
+                        name = :name,
+                        company = :company,
+                        email = :email,
+                        requirements = :requirements,
+                        status = COALESCE(:status, status)
+                    WHERE id = :id
+                """), {
+                    "id": lead["id"],
+                    "name": lead.get("name"),
+                    "company": lead.get("company"),
+                    "email": lead.get("email"),
+                    "requirements": requirements,
+                    "status": lead.get("status")
+                })
+                _reindex_lead(conn, lead["id"], dedup.normalize_email(existing.email))
+                return lead["id"]
+
+        if email_key:
+            existing = conn.execute(text("""
+                SELECT leads.* FROM lead_index JOIN leads ON leads.id = lead_index.lead_id
+                WHERE lead_index.email_key = :email_key ORDER BY leads.id LIMIT 1
+            """), {"email_key": email_key}).first()
+            if existing:
+                updates = {}
+                if not existing.company and lead.get("company"):
+                    updates["company"] = lead["company"]
+                if not existing.requirements and requirements:
+                    updates["requirements"] = requirements
+                if updates:
+                    assignments = ", ".join(f"{column} = :{column}" for column in updates)
+                    conn.execute(text(f"UPDATE leads SET {assignments} WHERE id = :id"), dict(updates, id=existing.id))
+                    _reindex_lead(conn, existing.id, email_key)
+                logger.info("Merged duplicate lead %s into lead %d.", lead.get("email"), existing.id)
+                return existing.id
+
+        result = conn.execute(text("""
+            INSERT INTO leads (id, name, company, email, requirements, status)
+            VALUES (:id, :name, :company, :email, :requirements, :status)
+        """), {
+            "id": lead.get("id"),
+            "name": lead.get("name"),
+            "company": lead.get("company"),
+            "email": lead.get("email"),
+            "requirements": requirements,
+            "status": lead.get("status") or "new"
+        })
+        lead_id = result.lastrowid
+        row = conn.execute(text("SELECT * FROM leads WHERE id = :id"), {"id": lead_id}).first()
+        canonical_id = _index_row(conn, dict(row._mapping))
+        if canonical_id != lead_id:
+            logger.info("Linked lead %d to possible duplicate lead %d.", lead_id, canonical_id)
+        return lead_id
+
+def get_cached_draft(email: str):
+    """
+    Retrieves the most recent draft generated for a lead's email address.
+
+    Drafts are only reused for the same (normalized) email address, never across leads that
+    are merely similar, so a draft is never sent to a different person than it addresses.
+
+    Args:
+        email (str): The lead's email address.
+
+    Returns:
+        tuple | None: The (subject, body) of the draft, or None if no draft exists.
+    """
+    email_key = dedup.normalize_email(email)
+    if not email_key:
+        return None
+    query = text("SELECT subject, body FROM drafts WHERE email_key = :email_key ORDER BY id DESC LIMIT 1")
+    try:
+        ensure_schema()
+        with get_engine().connect() as conn:
+            row = conn.execute(query, {"email_key": email_key}).first()
+            return (row.subject, row.body) if row else None
+    except SQLAlchemyError as e:
+        logger.error("Error fetching draft for %s: %s", email, e)
+        return None
+
+def save_draft(lead_id, email: str, subject: str, body: str) -> None:
+    """
+    Stores a generated or revised draft so that later requests for the same lead can reuse it.
+
+    Args:
+        lead_id (int | None): The id of the lead, if known.
+        email (str): The lead's email address.
+        subject (str): The email subject.
+        body (str): The email body.
+    """
+    email_key = dedup.normalize_email(email)
+    if not email_key:
+        return
+    try:
+        ensure_schema()
+        with get_engine().begin() as conn:
+            conn.execute(text("""
+                INSERT INTO drafts (lead_id, email_key, subject, body)
+                VALUES (:lead_id, :email_key, :subject, :body)
+            """), {"lead_id": lead_id, "email_key": email_key, "subject": subject, "body": body})
+    except SQLAlchemyError as e:
+        logger.error("Error saving draft for %s: %s", email, e)
+
+def ensure_change_log_schema(conn) -> None:
+    """
+    Creates the lead change log and the triggers that maintain it, if they do not exist yet.
+
+    Every insert, update or delete on the leads table appends a row to lead_changes, whose
+    autoincrement id serves as a monotonically increasing version of the leads table.
+
+    Args:
+        conn: An open SQLAlchemy connection.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS lead_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER NOT NULL,
+            change TEXT NOT NULL,
+            changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS leads_after_insert AFTER INSERT ON leads
+        BEGIN
+            INSERT INTO lead_changes (lead_id, change) VALUES (NEW.id, 'insert');
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS leads_after_update AFTER UPDATE ON leads
+        BEGIN
+            INSERT INTO lead_changes (lead_id, change) VALUES (NEW.id, 'update');
+        END
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER IF NOT EXISTS leads_after_delete AFTER DELETE ON leads
+        BEGIN
+            INSERT INTO lead_changes (lead_id, change) VALUES (OLD.id, 'delete');
+        END
+    """))
+
+def _current_version(conn) -> int:
+    """Returns the latest version recorded in the lead change log."""
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM lead_changes")).scalar()
+
+def get_leads_version() -> int:
+    """
+    Retrieves the current version of the leads table.
+
+    The version increases with every change to a lead and is used for ETags and delta queries.
+
+    Returns:
+        int: The current version, or 0 if no change has been recorded.
+    """
+    try:
+        ensure_schema()
+        with get_engine().connect() as conn:
+            return _current_version(conn)
+    except SQLAlchemyError as e:
+        logger.error("Error fetching leads version: %s", e)
+        return 0
+
+def get_lead_changes(since: int) -> dict:
+    """
+    Retrieves the changes to new leads after the given version.
+
+    Args:
+        since (int): The version the caller already has, e.g. the X-Leads-Version of a full
+            lead list. Changes are always read from the change log, so a caller at version 0
+            also learns about leads that stopped being new.
+
+    Returns:
+        dict: A dictionary with keys:
+            - version: The version the changes bring the caller to.
+            - leads: The new leads that were inserted or updated after `since`.
+            - removed: The ids of leads that were deleted or are no longer new.
+    """
+    try:
+        ensure_schema()
+        with get_engine().connect() as conn:
+            version = _current_version(conn)
+            changed_ids = [
+                row.lead_id for row in conn.execute(
+                    text("SELECT DISTINCT lead_id FROM lead_changes WHERE version > :since AND version <= :version"),
+                    {"since": since, "version": version}
+                )
+            ]
+            leads = []
+            removed = []
+            for lead_id in changed_ids:
+                row = conn.execute(text(_LEADS_QUERY + " WHERE leads.id = :id"), {"id": lead_id}).first()
+                if row is not None and row.status == 'new':
+                    leads.append(_parse_lead(row))
+                else:
+                    removed.append(lead_id)
+            return {"version": version, "leads": leads, "removed": removed}
+    except SQLAlchemyError as e:
+        logger.error("Error fetching lead changes since version %d: %s", since, e)
+        return {"version": since, "leads": [], "removed": []}
+
+def ensure_send_log_schema(conn) -> None:
+    """
+    Creates the table that records sent emails, if it does not exist yet.
+
+    Args:
+        conn: An open SQLAlchemy connection.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS email_sends (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER,
+            email TEXT NOT NULL,
+            subject TEXT,
+            sent_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+def record_send(lead_id, email: str, subject: str) -> None:
+    """
+    Records that an email was sent to a lead.
+
+    Args:
+        lead_id (int | None): The id of the lead, if known.
+        email (str): The recipient email address.
+        subject (str): The email subject.
+    """
+    try:
+        ensure_schema()
+        with get_engine().begin() as conn:
+            conn.execute(
+                text("INSERT INTO email_sends (lead_id, email, subject) VALUES (:lead_id, :email, :subject)"),
+                {"lead_id": lead_id, "email": email, "subject": subject}
+            )
+    except SQLAlchemyError as e:
+        logger.error("Error recording email sent to %s: %s", email, e)
@@ -0,0 +1,186 @@
+"""
+dedup.py
+
+This module provides the fingerprinting used to detect duplicate and near-duplicate leads.
+A lead is keyed by its normalized email address and by a MinHash signature computed over
+character shingles of its name, company and requirements. Signatures are split into bands
+so that candidate duplicates can be found through an index lookup instead of a full scan.
+
+Functions:
+    normalize_email(email: str) -> str
+        Returns a canonical key for an email address.
+    normalize_name(name: str) -> str
+        Returns a canonical key for a person's name.
+    lead_signature(lead: dict) -> list[int]
+        Computes the MinHash signature of a lead (empty if the lead has no text).
+    band_keys(signature: list[int]) -> list[tuple[int, str]]
+        Splits a signature into (band, bucket) keys for the locality-sensitive index.
+    estimate_similarity(sig_a: list[int], sig_b: list[int]) -> float
+        Estimates the Jaccard similarity of two leads from their signatures.
+
+Usage Examples:
+    >>> from agrim_ai_agent import dedup
+    >>> dedup.normalize_email(" John.Doe+crm@Gmail.com ")
+    'johndoe@gmail.com'
+    >>> sig = dedup.lead_signature({"name": "John Doe", "company": "Acme Corp"})
+    >>> dedup.estimate_similarity(sig, sig)
+    1.0
+"""
+
+import hashlib
+import json
+import re
+
+# Number of hash permutations in a signature and how they are grouped into bands.
+# With 16 bands of 4 rows, leads with a similarity of ~0.5 or more become candidates.
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Minimum estimated similarity for a candidate to be treated as a duplicate.
+SIMILARITY_THRESHOLD = 0.7
+
+SHINGLE_SIZE = 3
+
+# Domains where dots in the local part are ignored by the mail provider.
+_DOTLESS_DOMAINS = {"gmail.com", "googlemail.com"}
+
+# Universal hash family h(x) = (a * x + b) mod p used to simulate the permutations.
+# Coefficients are derived deterministically so signatures stay comparable across runs.
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode("ascii"), digest_size=8).digest(), "little") % (_MERSENNE_PRIME - 1) + 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode("ascii"), digest_size=8).digest(), "little") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+
+def normalize_email(email: str) -> str:
+    """
+    Normalizes an email address into a key that is stable across common spelling variants.
+
+    Lowercases the address, drops any "+tag" suffix from the local part and, for providers
+    that ignore them, removes dots from the local part.
+
+    Args:
+        email (str): The raw email address.
+
+    Returns:
+        str: The normalized email key, or an empty string if no address was given.
+    """
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return email
+    local, domain = email.rsplit("@", 1)
+    local = local.split("+", 1)[0]
+    if domain == "googlemail.com":
+        domain = "gmail.com"
+    if domain in _DOTLESS_DOMAINS:
+        local = local.replace(".", "")
+    return f"{local}@{domain}"
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a person's name into a key that ignores case, punctuation and spacing.
+
+    Args:
+        name (str): The raw name.
+
+    Returns:
+        str: The normalized name key, or an empty string if no name was given.
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", (name or "").lower()))
+
+
+def _lead_text(lead: dict) -> str:
+    """Builds the normalized text of a lead that is used for shingling."""
+    requirements = lead.get("requirements") or ""
+    if isinstance(requirements, dict):
+        requirements = " ".join(str(requirements[k]) for k in sorted(requirements))
+    else:
+        try:
+            parsed = json.loads(requirements)
+            if isinstance(parsed, dict):
+                requirements = " ".join(str(parsed[k]) for k in sorted(parsed))
+        except (TypeError, ValueError):
+            pass
+    text = " ".join([str(lead.get("name") or ""), str(lead.get("company") or ""), str(requirements)])
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def _shingles(text: str) -> set:
+    """Returns the set of character shingles of the given text."""
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def lead_signature(lead: dict) -> list:
+    """
+    Computes the MinHash signature of a lead over its name, company and requirements.
+
+    Args:
+        lead (dict): The lead, with optional name, company and requirements keys.
+            Requirements may be a dictionary or a (JSON) string.
+
+    Returns:
+        list[int]: A signature of NUM_PERM hash values, or an empty list if the lead has no
+        name, company or requirements to compare.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in _shingles(_lead_text(lead))
+    ]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature: list) -> list:
+    """
+    Splits a signature into the (band, bucket) keys stored in the lead index.
+
+    Args:
+        signature (list[int]): A signature produced by lead_signature.
+
+    Returns:
+        list[tuple[int, str]]: One (band number, bucket hash) pair per band, or an empty list
+        for an empty signature, which is never matched.
+    """
+    if not signature:
+        return []
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        bucket = hashlib.blake2b(",".join(map(str, rows)).encode("ascii"), digest_size=8).hexdigest()
+        keys.append((band, bucket))
+    return keys
+
+
+def estimate_similarity(sig_a: list, sig_b: list) -> float:
+    """
+    Estimates the Jaccard similarity of two leads from their MinHash signatures.
+
+    Args:
+        sig_a (list[int]): The first signature.
+        sig_b (list[int]): The second signature.
+
+    Returns:
+        float: The fraction of matching signature positions, between 0.0 and 1.0.
+    """
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def encode_signature(signature: list) -> str:
+    """Serializes a signature for storage in the database."""
+    return ",".join(map(str, signature))
+
+
+def decode_signature(value: str) -> list:
+    """Deserializes a signature stored with encode_signature."""
+    return [int(v) for v in value.split(",")] if value else []
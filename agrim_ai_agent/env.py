@@ -0,0 +1,26 @@
+"""
+env.py
+
+This module loads configuration from a `.env` file into the environment on first use.
+Modules call load_env() right before reading their settings instead of at import time,
+so importing the package does not pay for python-dotenv.
+
+Functions:
+    load_env() -> None
+        Loads the `.env` file once per process.
+
+Usage Examples:
+    >>> from agrim_ai_agent import env
+    >>> env.load_env()
+"""
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """
+    Loads variables from the `.env` file into os.environ, once per process.
+    Variables that are already set in the environment are not overridden.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
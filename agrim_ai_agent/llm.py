@@ -5,7 +5,8 @@ This module integrates with the Groq LLM API to generate and update custom email
 It leverages the Groq client for producing responses based on prompts generated from new lead data and historical projects.
 It also supports processing human feedback to refine the email draft.
 
-The module implements a GroqLLM class that uses the Groq client for LLM operations. The module exposes two functions:
+The module implements a GroqLLM class that uses the Groq client for LLM operations. The Groq SDK is imported
+and the client is created on first use, so importing this module is cheap. The module exposes two functions:
     generate_draft_email(new_lead: dict, past_projects: list) -> str
         Generates an initial email draft using new lead details and past project information.
     update_draft_email(current_draft: str, feedback: str) -> str
@@ -17,11 +18,21 @@ Usage Examples:
     >>> updated_draft = llm.update_draft_email(draft, feedback)
 """
 
-from dotenv import load_dotenv
-load_dotenv()
-from groq import Groq
-from time import sleep
+from functools import lru_cache
 from typing import List, Dict
+from agrim_ai_agent.env import load_env
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    Returns the shared Groq client, importing the SDK and creating the client on first use.
+
+    Returns:
+        groq.Groq: The Groq client, configured from the environment (GROQ_API_KEY).
+    """
+    load_env()
+    from groq import Groq
+    return Groq()
 
 # Dummy TTS implementation to simulate text-to-speech functionality.
 class DummyTTS:
@@ -42,7 +53,7 @@ class GroqLLM:
         Args:
             use_tts (bool): Flag to enable text-to-speech output.
         """
-        self.client = Groq()
+        self.client = get_client()
         self.tts = DummyTTS(use_tts=use_tts)
         self.messages: List[Dict[str, str]] = []
 
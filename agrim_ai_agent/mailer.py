@@ -2,7 +2,8 @@
 mailer.py
 
 This module provides email sending functionality for the Agrim AI agentic sales team.
-It sends emails to clients using SMTP with configurations provided through environment variables.
+It sends emails to clients using SMTP with configurations provided through environment variables,
+which are read (and smtplib imported) when an email is sent rather than at import time.
 
 Functions:
     send_email(to: str, subject: str, body: str) -> None
@@ -15,17 +16,20 @@ Usage Examples:
 
 import os
 import logging
-import smtplib
-from email.message import EmailMessage
+from agrim_ai_agent.env import load_env
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# SMTP configuration retrieved from environment variables.
-SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.example.com")
-SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
-SMTP_USER = os.environ.get("SMTP_USER", "your_email@example.com")
-SMTP_PASS = os.environ.get("SMTP_PASS", "password")
+def _smtp_config() -> tuple:
+    """Returns the SMTP (server, port, user, password), read from the environment on each send."""
+    load_env()
+    return (
+        os.environ.get("SMTP_SERVER", "smtp.example.com"),
+        int(os.environ.get("SMTP_PORT", 587)),
+        os.environ.get("SMTP_USER", "your_email@example.com"),
+        os.environ.get("SMTP_PASS", "password"),
+    )
 
 def send_email(to: str, subject: str, body: str) -> None:
     """
@@ -42,16 +46,20 @@ def send_email(to: str, subject: str, body: str) -> None:
     Example:
         >>> send_email("client@example.com", "Welcome to Agrim AI", "We are excited to work with you.")
     """
+    import smtplib
+    from email.message import EmailMessage
+
+    smtp_server, smtp_port, smtp_user, smtp_pass = _smtp_config()
     msg = EmailMessage()
-    msg["From"] = SMTP_USER
+    msg["From"] = smtp_user
     msg["To"] = to
     msg["Subject"] = subject
     msg.set_content(body)
 
     try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+        with smtplib.SMTP(smtp_server, smtp_port) as server:
             server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
+            server.login(smtp_user, smtp_pass)
             server.send_message(msg)
             logger.info("Email sent successfully to %s.", to)
     except Exception as e:
@@ -27,7 +27,8 @@ from agrim_ai_agent.project_matcher import match_projects
 from agrim_ai_agent.mailer import send_email
 from agrim_ai_agent.llm import generate_draft_email, update_draft_email
 
-def compose_engaging_email(lead_name: str, lead_email: str, lead_requirements: dict) -> tuple:
+def compose_engaging_email(lead_name: str, lead_email: str, lead_requirements: dict, lead_id: int = None,
+                           regenerate: bool = False) -> tuple:
     """
     Compose a customized email draft for the given lead using LLM-based generation.
     Combines new lead details with past project data to produce a well-structured and engaging email draft.
@@ -37,13 +38,26 @@ def compose_engaging_email(lead_name: str, lead_email: str, lead_requirements: d
         lead_email (str): The email address of the lead.
         lead_requirements (dict): A dictionary containing the lead's requirements,
             e.g., {'objective': 'Customer Engagement', 'industry': 'Retail'}.
+        lead_id (int, optional): The id of the lead in the leads table, if known.
+        regenerate (bool): Generate a new draft even if one is stored for this lead.
 
     Returns:
         tuple: A tuple containing the email subject (str) and the email body (str).
 
     The generated draft is expected to begin with a subject line followed by the body.
     If parsing fails, a default subject is applied.
+
+    If a draft was already generated for the same (normalized) email address, e.g. for a lead
+    that submitted the form twice, it is reused instead of starting a new generation.
     """
+    # Imported here so that importing the workflow does not load SQLAlchemy.
+    from agrim_ai_agent import database
+    if not regenerate:
+        cached = database.get_cached_draft(lead_email)
+        if cached:
+            logging.info(f"Reusing existing draft for {lead_email}")
+            return cached
+
     projects = match_projects(lead_requirements)
     
     # Prepare lead details for LLM generation; default company if not provided.
@@ -64,6 +78,7 @@ def compose_engaging_email(lead_name: str, lead_email: str, lead_requirements: d
     else:
         subject = "Your Customized AI Solutions"
         body = draft.strip()
+    database.save_draft(lead_id, lead_email, subject, body)
     return subject, body
 
 def get_human_feedback(subject: str, body: str) -> bool:
@@ -95,10 +110,12 @@ def process_lead(lead_info: dict) -> None:
             - requirements: Lead requirements dict
             - subject: Email subject
             - body: Email body
+            - id: Lead's id in the leads table (optional)
 
     Returns:
         None
     """
+    from agrim_ai_agent import database
     try:
         if not all(k in lead_info for k in ['email', 'subject', 'body']):
             raise ValueError("Missing required email information (email, subject, or body)")
@@ -109,6 +126,7 @@ def process_lead(lead_info: dict) -> None:
             body=lead_info['body']
         )
         logging.info(f"Email sent to {lead_info['email']}")
+        database.record_send(lead_info.get('id'), lead_info['email'], lead_info['subject'])
     except Exception as e:
         logging.error(f"Failed to send email to {lead_info.get('email', 'unknown')}: {str(e)}")
         raise
@@ -3,30 +3,95 @@ Flask application to serve as backend API for the Agrim AI Agentic Sales UI.
 Integrates with existing workflow and database functionality.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from agrim_ai_agent.database import get_new_leads
+from agrim_ai_agent.database import ensure_schema, get_new_leads, get_leads_version, get_lead_changes, save_draft
 from agrim_ai_agent.workflow import compose_engaging_email, process_lead
 from agrim_ai_agent.llm import update_draft_email
+import json
 import logging
+import time
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Enable CORS for all routes; expose the version headers so the UI can make conditional requests
+CORS(app, expose_headers=["ETag", "X-Leads-Version"])
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How often the lead stream checks the change counter, and how often it sends a keep-alive.
+LEADS_POLL_INTERVAL = 1.0
+LEADS_KEEPALIVE_INTERVAL = 15.0
+
+def _leads_etag(version: int, since: int = None) -> str:
+    """Build the ETag for the lead list (or a delta from `since`) at the given version."""
+    return f"leads-{version}" if since is None else f"leads-{since}-{version}"
+
 @app.route('/api/leads', methods=['GET'])
 def get_leads():
-    """Fetch all new leads from the database."""
+    """
+    Fetch new leads from the database.
+
+    Without parameters, returns the full list of new leads. With `?since=N`, returns only the
+    changes after version N as {"version", "leads", "removed"}. Both forms carry an ETag derived
+    from the lead change counter and answer 304 when If-None-Match matches.
+    """
     try:
-        leads = get_new_leads()
-        return jsonify(leads)
+        since = request.args.get('since', type=int)
+        version = get_leads_version()
+        etag = _leads_etag(version, since)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif since is None:
+            response = jsonify(get_new_leads())
+        else:
+            changes = get_lead_changes(since)
+            version = changes["version"]
+            etag = _leads_etag(version, since)
+            response = jsonify(changes)
+        response.set_etag(etag)
+        response.headers["X-Leads-Version"] = str(version)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except Exception as e:
         logger.error(f"Error fetching leads: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/leads/stream', methods=['GET'])
+def stream_leads():
+    """
+    Push lead inserts and status changes as server-sent events.
+
+    Each `leads` event carries the same delta as `/api/leads?since=N` and uses the version as
+    its event id, so a reconnecting client resumes from Last-Event-ID. The stream starts from
+    `?since=N`, or from the current version if neither is given.
+    """
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    if since is None:
+        since = get_leads_version()
+
+    def events(version):
+        yield f"retry: {int(LEADS_POLL_INTERVAL * 1000)}\n\n"
+        last_sent = time.monotonic()
+        while True:
+            if get_leads_version() > version:
+                changes = get_lead_changes(version)
+                version = changes["version"]
+                yield f"id: {version}\nevent: leads\ndata: {json.dumps(changes)}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= LEADS_KEEPALIVE_INTERVAL:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(LEADS_POLL_INTERVAL)
+
+    return Response(events(since), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route('/api/draft-email', methods=['POST'])
 def create_draft():
     """Generate an email draft for a specific lead."""
@@ -43,7 +108,9 @@ def create_draft():
         subject, body = compose_engaging_email(
             lead_name=lead_data.get('name'),
             lead_email=lead_data.get('email'),
-            lead_requirements=lead_data.get('requirements', {})
+            lead_requirements=lead_data.get('requirements', {}),
+            lead_id=lead_data.get('id'),
+            regenerate=bool(lead_data.get('regenerate', False))
         )
         
         if not subject or not body:
@@ -79,6 +146,10 @@ def update_draft_route():
         else:
             subject = "Updated Email Draft"
             body = updated_draft.strip()
+
+        # Store the revision so the lead's next draft request reuses the refined draft
+        if data.get('email'):
+            save_draft(data.get('id'), data['email'], subject, body)
             
         return jsonify({
             "subject": subject,
@@ -97,6 +168,7 @@ def send_email_route():
             return jsonify({"error": "Email must be approved before sending"}), 400
             
         lead_info = {
+            'id': data.get('id'),
             'name': data.get('name'),
             'email': data.get('email'),
             'requirements': data.get('requirements', {}),
@@ -110,4 +182,6 @@ def send_email_route():
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    # Create the supporting tables up front so request handlers only read and write rows
+    ensure_schema()
     app.run(debug=True, port=5000)
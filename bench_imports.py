@@ -0,0 +1,96 @@
+"""
+bench_imports.py
+
+This script measures the cold import time of the agent's entry modules with `python -X importtime`
+and checks it against a budget. It also checks that importing them does not load the heavy
+dependencies (Groq SDK, SQLAlchemy, python-dotenv), which must only be imported on first use.
+
+It exits with a non-zero status if any module is over budget or loads a deferred dependency.
+The same budgets are enforced by tests/test_import_time.py; this script prints the timings.
+
+Usage:
+    python bench_imports.py
+"""
+
+import os
+import subprocess
+import sys
+
+# Cumulative import time budget per module, in microseconds.
+IMPORT_BUDGETS_US = {
+    "agrim_ai_agent.workflow": 50_000,
+    "agrim_ai_agent.llm": 20_000,
+    "agrim_ai_agent.mailer": 20_000,
+}
+
+# Modules that must not be imported until they are actually used.
+DEFERRED_MODULES = ["groq", "sqlalchemy", "dotenv"]
+
+# Each measurement is repeated and the fastest run kept, to filter out scheduling noise.
+RUNS = 5
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def measure_import(module: str) -> tuple:
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        tuple: The cumulative import time of the module in microseconds (int) and
+        the names of all modules imported along with it (set of str).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=REPO_ROOT
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cumulative_us.strip().isdigit():
+            continue  # header line
+        imported.add(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    if cumulative is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return cumulative, imported
+
+def best_import(module: str) -> tuple:
+    """
+    Measures a module's import RUNS times.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        tuple: The fastest cumulative import time in microseconds (int) and the deferred
+        dependencies that the import loaded (list of str).
+    """
+    runs = [measure_import(module) for _ in range(RUNS)]
+    best = min(cumulative for cumulative, _ in runs)
+    loaded = [m for m in DEFERRED_MODULES if any(m in imported for _, imported in runs)]
+    return best, loaded
+
+def main() -> int:
+    failures = []
+    for module, budget in IMPORT_BUDGETS_US.items():
+        best, loaded = best_import(module)
+        status = "ok" if best <= budget and not loaded else "FAIL"
+        print(f"{module:<28} {best / 1000:8.1f} ms (budget {budget / 1000:.0f} ms)  {status}")
+        if best > budget:
+            failures.append(f"{module} took {best / 1000:.1f} ms, over its {budget / 1000:.0f} ms budget")
+        if loaded:
+            failures.append(f"{module} imports deferred dependencies: {', '.join(loaded)}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ Usage:
 """
 
 from sqlalchemy import create_engine, text
+from agrim_ai_agent.database import insert_lead
 
 # Database connection string (using SQLite)
 DATABASE_URL = "sqlite:///agrim_ai_agent.db"
@@ -17,22 +18,13 @@ engine = create_engine(DATABASE_URL, echo=True)
 def add_or_update_leads(entries):
     """
     Add or update multiple entries in the leads table.
+    Entries go through the dedup index: duplicates are merged or linked, and updated leads are re-indexed.
 
     Args:
         entries (list of dict): List of dictionaries containing lead data.
     """
-    with engine.begin() as conn:
-        for entry in entries:
-            conn.execute(text("""
-                INSERT INTO leads (id, name, company, email, requirements, status)
-                VALUES (:id, :name, :company, :email, :requirements, :status)
-                ON CONFLICT(id) DO UPDATE SET
-                    name = excluded.name,
-                    company = excluded.company,
-                    email = excluded.email,
-                    requirements = excluded.requirements,
-                    status = excluded.status
-            """), entry)
+    for entry in entries:
+        insert_lead(entry)
 
 def add_or_update_past_projects(entries):
     """
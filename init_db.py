@@ -1,14 +1,15 @@
 """
 init_db.py
 
-This script initializes the SQLite database by creating the necessary tables (leads and past_projects)
-and inserting dummy data for testing purposes.
+This script initializes the SQLite database by creating the necessary tables (leads, past_projects,
+the lead dedup index and the lead change log) and inserting dummy data for testing purposes.
 
 Usage:
     python init_db.py
 """
 
 from sqlalchemy import create_engine, text
+from agrim_ai_agent.database import ensure_schema, insert_lead
 
 # Database connection string (using SQLite)
 DATABASE_URL = "sqlite:///agrim_ai_agent.db"
@@ -39,22 +40,25 @@ with engine.begin() as conn:
         )
     """))
     
-    # Insert dummy data into leads table with JSON requirements
-    conn.execute(text("""
-        INSERT INTO leads (name, company, email, requirements, status)
-        VALUES 
-            ('John Doe', 'Acme Corp', 'john.doe@example.com', 
-             '{"objective": "Customer Engagement", "industry": "Technology", "description": "Need an AI chatbot for customer support"}', 
-             'new'),
-            ('Jane Smith', 'Tech Inc', 'jane.smith@techinc.com',
-             '{"objective": "Process Automation", "industry": "Manufacturing", "description": "Looking for ML solution for quality control"}',
-             'new')
-    """))
-    
     # Insert dummy data into past_projects table
     conn.execute(text("""
         INSERT INTO past_projects (project_name, details, results)
         VALUES ('ChatBot', 'Implemented a conversational AI solution.', 'Increased customer engagement')
     """))
 
+# Create the lead dedup index, draft, change log and send log tables if they don't exist
+ensure_schema()
+
+# Insert dummy data into leads table with JSON requirements, checking the dedup index
+insert_lead({
+    'name': 'John Doe', 'company': 'Acme Corp', 'email': 'john.doe@example.com',
+    'requirements': {"objective": "Customer Engagement", "industry": "Technology", "description": "Need an AI chatbot for customer support"},
+    'status': 'new'
+})
+insert_lead({
+    'name': 'Jane Smith', 'company': 'Tech Inc', 'email': 'jane.smith@techinc.com',
+    'requirements': {"objective": "Process Automation", "industry": "Manufacturing", "description": "Looking for ML solution for quality control"},
+    'status': 'new'
+})
+
 print("Database initialized with dummy data.")
@@ -0,0 +1,47 @@
+"""
+Shared fixtures for the unit tests.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import text
+
+from agrim_ai_agent import database
+
+
+def use_temp_database(test_case: unittest.TestCase) -> None:
+    """Points the database module at a fresh SQLite file for the duration of a test."""
+    tmp_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(tmp_dir.cleanup)
+    patches = [
+        mock.patch.object(database, "DATABASE_URL", f"sqlite:///{os.path.join(tmp_dir.name, 'test.db')}"),
+        mock.patch.object(database, "_engine", None),
+        mock.patch.object(database, "_schema_ready", False),
+    ]
+    for patch in patches:
+        patch.start()
+        test_case.addCleanup(patch.stop)
+    with database.get_engine().begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE leads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                company TEXT,
+                email TEXT,
+                requirements TEXT,
+                status TEXT DEFAULT 'new'
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE past_projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name TEXT NOT NULL,
+                details TEXT,
+                results TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+    test_case.addCleanup(lambda: database.get_engine().dispose())
@@ -0,0 +1,81 @@
+"""
+Unit tests for the columnar analytics snapshots.
+"""
+
+import datetime
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import text
+
+from agrim_ai_agent import analytics, database
+from helpers import use_temp_database
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class ExportSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        use_temp_database(self)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.output_dir = tmp_dir.name
+
+    def export(self, day=1):
+        return analytics.export_snapshot(self.output_dir, snapshot_date=datetime.date(2025, 3, day))
+
+    def test_exports_only_new_and_changed_rows(self):
+        john = database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        database.save_draft(john, "john@example.com", "Hello", "Body")
+        database.record_send(john, "john@example.com", "Hello")
+        first = self.export()
+        self.assertEqual((first["leads"], first["drafts"], first["email_sends"]), (1, 1, 1))
+
+        second = self.export()
+        self.assertEqual((second["leads"], second["drafts"], second["email_sends"]), (0, 0, 0))
+
+        database.insert_lead({"id": john, "name": "John Doe", "email": "john@example.com", "status": "contacted"})
+        self.assertEqual(self.export()["leads"], 1)
+        leads = analytics.scan("leads", columns=["id", "status", "_version"], output_dir=self.output_dir)
+        latest = max(leads.to_pylist(), key=lambda lead: lead["_version"])
+        self.assertEqual(latest["status"], "contacted")
+
+        drafts = analytics.scan("drafts", columns=["lead_id"], output_dir=self.output_dir)
+        self.assertEqual(drafts.column_names, ["lead_id", "date"])
+        self.assertEqual(drafts.column("lead_id").to_pylist(), [john])
+
+    def test_past_projects_snapshot_includes_edits(self):
+        with database.get_engine().begin() as conn:
+            conn.execute(text("INSERT INTO past_projects (project_name, results) VALUES ('ChatBot', 'Old')"))
+        self.export(day=1)
+        with database.get_engine().begin() as conn:
+            conn.execute(text("UPDATE past_projects SET results = 'New' WHERE id = 1"))
+        self.export(day=2)
+
+        latest = analytics.scan("past_projects", start_date="2025-03-02", output_dir=self.output_dir)
+        self.assertEqual(latest.column("results").to_pylist(), ["New"])
+
+    def test_mixed_column_types(self):
+        with database.get_engine().begin() as conn:
+            conn.execute(text("ALTER TABLE leads ADD COLUMN score REAL"))
+            conn.execute(text("ALTER TABLE leads ADD COLUMN visits INTEGER"))
+            conn.execute(text("INSERT INTO leads (name, company, score, visits) VALUES ('John Doe', 42, 0.5, '3')"))
+            conn.execute(text("INSERT INTO leads (name, company, score, visits) VALUES ('Jane Smith', 'Acme', 'n/a', 1.5)"))
+        self.export()
+        leads = analytics.scan("leads", columns=["company", "score", "visits"], output_dir=self.output_dir)
+        self.assertEqual(leads.sort_by("company").to_pylist(), [
+            {"company": "42", "score": 0.5, "visits": 3, "date": "2025-03-01"},
+            {"company": "Acme", "score": None, "visits": None, "date": "2025-03-01"},
+        ])
+
+    def test_output_dir_defaults_to_environment(self):
+        database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        with mock.patch.dict(os.environ, {"ANALYTICS_DIR": self.output_dir}):
+            self.assertEqual(analytics.export_snapshot(snapshot_date=datetime.date(2025, 3, 1))["leads"], 1)
+            self.assertEqual(analytics.scan("leads", columns=["name"]).column("name").to_pylist(), ["John Doe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Unit tests for lead deduplication: normalization, signatures and the dedup index.
+"""
+
+import json
+import unittest
+from unittest import mock
+
+from sqlalchemy import text
+
+from agrim_ai_agent import database, dedup
+from agrim_ai_agent.workflow import compose_engaging_email
+from helpers import use_temp_database
+
+REQUIREMENTS = {"industry": "Retail", "description": "Need an AI chatbot for customer support"}
+
+
+class NormalizationTest(unittest.TestCase):
+    def test_normalize_email(self):
+        self.assertEqual(dedup.normalize_email(" John.Doe+crm@Gmail.com "), "johndoe@gmail.com")
+        self.assertEqual(dedup.normalize_email("john.doe@googlemail.com"), "johndoe@gmail.com")
+        self.assertEqual(dedup.normalize_email("John.Doe+x@Acme.com"), "john.doe@acme.com")
+        self.assertEqual(dedup.normalize_email(None), "")
+
+    def test_normalize_name(self):
+        self.assertEqual(dedup.normalize_name("  John   SMITH, "), "john smith")
+        self.assertEqual(dedup.normalize_name(None), "")
+
+
+class SignatureTest(unittest.TestCase):
+    def test_similar_leads_have_similar_signatures(self):
+        a = dedup.lead_signature({"name": "John Doe", "company": "Acme Corp", "requirements": REQUIREMENTS})
+        b = dedup.lead_signature({"name": "John Doe", "company": "ACME Corporation", "requirements": REQUIREMENTS})
+        c = dedup.lead_signature({"name": "Jane Smith", "company": "Tech Inc", "requirements": "Quality control ML"})
+        self.assertGreaterEqual(dedup.estimate_similarity(a, b), dedup.SIMILARITY_THRESHOLD)
+        self.assertLess(dedup.estimate_similarity(a, c), dedup.SIMILARITY_THRESHOLD)
+
+    def test_requirements_json_string_matches_dict(self):
+        a = dedup.lead_signature({"name": "John", "requirements": REQUIREMENTS})
+        b = dedup.lead_signature({"name": "John", "requirements": json.dumps(REQUIREMENTS)})
+        self.assertEqual(a, b)
+
+    def test_empty_lead_is_never_matched(self):
+        signature = dedup.lead_signature({"name": "", "company": None})
+        self.assertEqual(signature, [])
+        self.assertEqual(dedup.band_keys(signature), [])
+        self.assertEqual(dedup.estimate_similarity(signature, signature), 0.0)
+
+
+class LeadIndexTest(unittest.TestCase):
+    def setUp(self):
+        use_temp_database(self)
+
+    def _index_entry(self, lead_id):
+        with database.get_engine().connect() as conn:
+            return conn.execute(
+                text("SELECT * FROM lead_index WHERE lead_id = :id"), {"id": lead_id}
+            ).first()
+
+    def _lead_count(self):
+        with database.get_engine().connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM leads")).scalar()
+
+    def test_same_email_is_merged(self):
+        first = database.insert_lead({"name": "John Doe", "email": "john.doe@gmail.com"})
+        second = database.insert_lead({
+            "name": "John Doe", "email": "JohnDoe+crm@gmail.com", "company": "Acme", "requirements": REQUIREMENTS
+        })
+        self.assertEqual(first, second)
+        self.assertEqual(self._lead_count(), 1)
+        lead = database.get_new_leads()[0]
+        self.assertEqual(lead["company"], "Acme")
+        self.assertEqual(lead["requirements"], REQUIREMENTS)
+
+    def test_same_name_and_content_is_linked(self):
+        first = database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail", "email": "john@acme.com", "requirements": REQUIREMENTS
+        })
+        second = database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail Ltd", "email": "jsmith@gmail.com", "requirements": REQUIREMENTS
+        })
+        self.assertNotEqual(first, second)
+        self.assertEqual(self._index_entry(second).canonical_id, first)
+        duplicates = {lead["id"]: lead["duplicate_of"] for lead in database.get_new_leads()}
+        self.assertEqual(duplicates, {first: None, second: first})
+
+    def test_different_names_are_not_linked(self):
+        database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail", "email": "john@acme.com", "requirements": REQUIREMENTS
+        })
+        mary = database.insert_lead({
+            "name": "Mary Jones", "company": "Acme Retail", "email": "mary@acme.com", "requirements": REQUIREMENTS
+        })
+        self.assertEqual(self._index_entry(mary).canonical_id, mary)
+
+    def test_empty_leads_are_not_linked(self):
+        first = database.insert_lead({"name": "", "email": "a@example.com"})
+        second = database.insert_lead({"name": "", "email": "b@example.com"})
+        self.assertEqual(self._index_entry(second).canonical_id, second)
+        self.assertNotEqual(first, second)
+
+    def test_leads_written_directly_are_backfilled(self):
+        with database.get_engine().begin() as conn:
+            conn.execute(text("INSERT INTO leads (name, email) VALUES ('John Doe', 'john@example.com')"))
+        lead_id = database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        self.assertEqual(lead_id, 1)
+        self.assertEqual(self._lead_count(), 1)
+
+    def test_update_by_id_reindexes_lead_and_its_duplicates(self):
+        first = database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail", "email": "john@acme.com", "requirements": REQUIREMENTS
+        })
+        second = database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail", "email": "js@gmail.com", "requirements": REQUIREMENTS
+        })
+        database.save_draft(first, "john@acme.com", "Hello John", "Body")
+        database.insert_lead({
+            "id": first, "name": "Someone Else", "company": "Other Co", "email": "john@acme.com",
+            "requirements": "Completely different needs"
+        })
+        self.assertIsNone(database.get_cached_draft("john@acme.com"))
+        self.assertEqual(self._index_entry(second).canonical_id, second)
+
+    def test_deleted_lead_is_not_a_duplicate(self):
+        database.insert_lead({"name": "Jane Roe", "email": "j@acme.com"})
+        with database.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM leads"))
+        lead_id = database.insert_lead({"name": "Jane Roe", "email": "j@acme.com"})
+        self.assertIsNone(self._index_entry(1))
+        self.assertEqual(self._index_entry(lead_id).canonical_id, lead_id)
+        self.assertIsNone(database.get_new_leads()[0]["duplicate_of"])
+
+    def test_deleting_canonical_lead_keeps_its_duplicates_linked(self):
+        lead = {"name": "John Smith", "company": "Acme Retail", "requirements": REQUIREMENTS}
+        first = database.insert_lead(dict(lead, email="john@acme.com"))
+        second = database.insert_lead(dict(lead, email="js@gmail.com"))
+        third = database.insert_lead(dict(lead, email="smith@yahoo.com"))
+        with database.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM leads WHERE id = :id"), {"id": first})
+        duplicates = {lead["id"]: lead["duplicate_of"] for lead in database.get_new_leads()}
+        self.assertEqual(duplicates, {second: None, third: second})
+
+
+class DraftReuseTest(unittest.TestCase):
+    def setUp(self):
+        use_temp_database(self)
+        self.generate = mock.patch(
+            "agrim_ai_agent.workflow.generate_draft_email",
+            side_effect=lambda lead, projects: f"Hello {lead['name']}\nBody for {lead['name']}"
+        ).start()
+        mock.patch("agrim_ai_agent.workflow.match_projects", return_value=[]).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_draft_reused_for_same_email(self):
+        first = compose_engaging_email("John Smith", "john@acme.com", REQUIREMENTS)
+        second = compose_engaging_email("John Smith", "John+x@Acme.com", REQUIREMENTS)
+        self.assertEqual(first, second)
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_draft_not_reused_across_people(self):
+        john = database.insert_lead({
+            "name": "John Smith", "company": "Acme Retail", "email": "john@acme.com", "requirements": REQUIREMENTS
+        })
+        mary = database.insert_lead({
+            "name": "Mary Jones", "company": "Acme Retail", "email": "mary@acme.com", "requirements": REQUIREMENTS
+        })
+        compose_engaging_email("John Smith", "john@acme.com", REQUIREMENTS, lead_id=john)
+        subject, _ = compose_engaging_email("Mary Jones", "mary@acme.com", REQUIREMENTS, lead_id=mary)
+        self.assertEqual(subject, "Hello Mary Jones")
+
+    def test_draft_not_reused_across_linked_duplicates(self):
+        compose_engaging_email("John Smith", "john@acme.com", REQUIREMENTS)
+        compose_engaging_email("John Smith", "jsmith@gmail.com", REQUIREMENTS)
+        self.assertEqual(self.generate.call_count, 2)
+
+    def test_regenerate_skips_cached_draft(self):
+        compose_engaging_email("John Smith", "john@acme.com", REQUIREMENTS)
+        compose_engaging_email("John Smith", "john@acme.com", REQUIREMENTS, regenerate=True)
+        self.assertEqual(self.generate.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
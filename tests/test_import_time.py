@@ -0,0 +1,22 @@
+"""
+Checks the cold import time budget of the agent's entry modules (see bench_imports.py).
+"""
+
+import unittest
+
+from bench_imports import IMPORT_BUDGETS_US, best_import
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_imports_within_budget_and_defer_heavy_dependencies(self):
+        for module, budget in IMPORT_BUDGETS_US.items():
+            with self.subTest(module=module):
+                best, loaded = best_import(module)
+                self.assertEqual(loaded, [], f"{module} imports deferred dependencies")
+                self.assertLessEqual(
+                    best, budget, f"{module} took {best / 1000:.1f} ms, over its {budget / 1000:.0f} ms budget"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
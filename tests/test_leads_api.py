@@ -0,0 +1,128 @@
+"""
+Unit tests for versioned lead deltas, ETags and the lead stream of the Flask API.
+"""
+
+import json
+import unittest
+
+from sqlalchemy import text
+
+import app as app_module
+from agrim_ai_agent import database
+from helpers import use_temp_database
+
+
+class LeadChangesTest(unittest.TestCase):
+    def setUp(self):
+        use_temp_database(self)
+
+    def test_version_advances_on_every_change(self):
+        self.assertEqual(database.get_leads_version(), 0)
+        lead_id = database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        self.assertEqual(database.get_leads_version(), 1)
+        database.insert_lead({"id": lead_id, "name": "John Doe", "email": "john@example.com", "status": "contacted"})
+        self.assertEqual(database.get_leads_version(), 2)
+
+    def test_changes_since_version(self):
+        john = database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        version = database.get_leads_version()
+        jane = database.insert_lead({"name": "Jane Smith", "email": "jane@example.com"})
+        with database.get_engine().begin() as conn:
+            conn.execute(text("UPDATE leads SET status = 'contacted' WHERE id = :id"), {"id": john})
+
+        changes = database.get_lead_changes(version)
+        self.assertEqual(changes["version"], database.get_leads_version())
+        self.assertEqual([lead["id"] for lead in changes["leads"]], [jane])
+        self.assertEqual(changes["removed"], [john])
+        self.assertEqual(database.get_lead_changes(changes["version"])["leads"], [])
+
+    def test_changes_since_zero_returns_all_new_leads(self):
+        database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+        database.insert_lead({"name": "Jane Smith", "email": "jane@example.com"})
+        changes = database.get_lead_changes(0)
+        self.assertEqual(len(changes["leads"]), 2)
+        self.assertEqual(changes["removed"], [])
+
+    def test_changes_since_zero_report_leads_that_are_no_longer_new(self):
+        database.ensure_schema()
+        with database.get_engine().begin() as conn:
+            conn.execute(text("INSERT INTO leads (name, email) VALUES ('John Doe', 'john@example.com')"))
+            conn.execute(text("INSERT INTO leads (name, email) VALUES ('Jane Smith', 'jane@example.com')"))
+            conn.execute(text("UPDATE leads SET status = 'contacted' WHERE id = 1"))
+        changes = database.get_lead_changes(0)
+        self.assertEqual([lead["id"] for lead in changes["leads"]], [2])
+        self.assertEqual(changes["removed"], [1])
+
+    def test_changes_include_leads_unlinked_by_a_reindex(self):
+        lead = {"name": "John Smith", "company": "Acme Retail", "requirements": "AI chatbot for support"}
+        first = database.insert_lead(dict(lead, email="john@acme.com"))
+        second = database.insert_lead(dict(lead, email="js@gmail.com"))
+        version = database.get_leads_version()
+        database.insert_lead({"id": first, "name": "Someone Else", "email": "john@acme.com"})
+        changes = {lead["id"]: lead for lead in database.get_lead_changes(version)["leads"]}
+        self.assertEqual(set(changes), {first, second})
+        self.assertIsNone(changes[second]["duplicate_of"])
+
+    def test_changes_include_duplicates_of_a_deleted_lead(self):
+        lead = {"name": "John Smith", "company": "Acme Retail", "requirements": "AI chatbot for support"}
+        first = database.insert_lead(dict(lead, email="john@acme.com"))
+        second = database.insert_lead(dict(lead, email="js@gmail.com"))
+        version = database.get_leads_version()
+        with database.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM leads WHERE id = :id"), {"id": first})
+        changes = database.get_lead_changes(version)
+        self.assertEqual(changes["removed"], [first])
+        self.assertEqual([(lead["id"], lead["duplicate_of"]) for lead in changes["leads"]], [(second, None)])
+
+
+class LeadsEndpointTest(unittest.TestCase):
+    def setUp(self):
+        use_temp_database(self)
+        self.client = app_module.app.test_client()
+        database.insert_lead({"name": "John Doe", "email": "john@example.com"})
+
+    def test_full_list_has_etag_and_version(self):
+        response = self.client.get('/api/leads')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([lead["name"] for lead in response.json], ["John Doe"])
+        self.assertEqual(response.headers["X-Leads-Version"], "1")
+        self.assertEqual(response.get_etag()[0], "leads-1")
+
+    def test_if_none_match_returns_not_modified_until_a_change(self):
+        etag = self.client.get('/api/leads').headers["ETag"]
+        response = self.client.get('/api/leads', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        database.insert_lead({"name": "Jane Smith", "email": "jane@example.com"})
+        response = self.client.get('/api/leads', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 2)
+
+    def test_delta_query(self):
+        database.insert_lead({"name": "Jane Smith", "email": "jane@example.com"})
+        response = self.client.get('/api/leads?since=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["version"], 2)
+        self.assertEqual([lead["name"] for lead in response.json["leads"]], ["Jane Smith"])
+
+        response = self.client.get('/api/leads?since=2', headers={"If-None-Match": '"leads-2-2"'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_stream_pushes_changes(self):
+        database.insert_lead({"name": "Jane Smith", "email": "jane@example.com"})
+        response = self.client.get('/api/leads/stream?since=1', buffered=False)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = iter(response.response)
+        self.assertTrue(next(events).startswith(b"retry:"))
+        event = next(events).decode()
+        response.close()
+
+        lines = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+        self.assertEqual(lines["id"], "2")
+        self.assertEqual(lines["event"], "leads")
+        self.assertEqual([lead["name"] for lead in json.loads(lines["data"])["leads"]], ["Jane Smith"])
+
+
+if __name__ == "__main__":
+    unittest.main()